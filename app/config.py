@@ -1,21 +1,20 @@
 import os
+import re
 from pathlib import Path
 
+_ENV_LINE_RE = re.compile(r"(?m)^[ \t]*([^#\s=][^=\r\n]*?)[ \t]*=[ \t]*(.*?)[ \t]*\r?$")
 
-def _load_env_file() -> None:
-    env_path = Path(__file__).resolve().parent.parent / ".env"
+
+ENV_PATH = Path(__file__).resolve().parent.parent / ".env"
+
+
+def _load_env_file(env_path: Path = ENV_PATH) -> None:
     if not env_path.exists():
         return
 
-    for raw_line in env_path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip().strip('"').strip("'")
-        os.environ.setdefault(key, value)
+    for match in _ENV_LINE_RE.finditer(env_path.read_text(encoding="utf-8")):
+        key, value = match.groups()
+        os.environ.setdefault(key, value.strip('"').strip("'"))
 
 
 _load_env_file()
@@ -34,18 +33,26 @@ class Settings:
     )
 
     UPLOAD_DIR = os.getenv("UPLOAD_DIR", "data/uploads")
-    EXCEL_CHUNK_SIZE = int(os.getenv("EXCEL_CHUNK_SIZE", "500"))
+    EXCEL_CHUNK_SIZE = max(1, int(os.getenv("EXCEL_CHUNK_SIZE", "10000")))
+    EXCEL_WORKER_PROCESSES = int(
+        os.getenv("EXCEL_WORKER_PROCESSES", str(os.cpu_count() or 1))
+    )
+    USE_LOAD_DATA_INFILE = _to_bool(
+        os.getenv("USE_LOAD_DATA_INFILE", "false"), default=False
+    )
     CLEANUP_EXPIRED_UPLOADS = _to_bool(
         os.getenv("CLEANUP_EXPIRED_UPLOADS", "true"), default=True
     )
     UPLOAD_FILE_RETENTION_HOURS = int(
         os.getenv("UPLOAD_FILE_RETENTION_HOURS", "72")
     )
+    CLEANUP_INTERVAL_SECONDS = int(os.getenv("CLEANUP_INTERVAL_SECONDS", "3600"))
     REQUIRED_COLUMNS = tuple(
         column.strip()
         for column in os.getenv("REQUIRED_COLUMNS", "name,email,age").split(",")
         if column.strip()
     )
+    REQUIRED_COLUMNS_SET = frozenset(REQUIRED_COLUMNS)
 
 
 settings = Settings()
\ No newline at end of file
@@ -1,18 +1,64 @@
+import os
+import tempfile
+
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, text, update
 from .models import UploadJob, User
-from typing import Sequence, Mapping, Any
+from typing import Any, Iterable, Mapping, Sequence
 from datetime import datetime
 
+JOB_QUERY_YIELD_PER = 1000
+
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
 
 def bulk_insert_users(db: Session, users: Sequence[Mapping[str, Any]]):
-    db.bulk_insert_mappings(User, users)
-    db.commit()
+    db.execute(insert(User.__table__), list(users))
+
+
+def load_data_users(
+    db: Session,
+    names: Sequence[str],
+    emails: Sequence[str],
+    ages: Sequence[int],
+) -> int:
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", newline="", suffix=".tsv", delete=False
+    ) as tsv_file:
+        for name, email, age in zip(names, emails, ages):
+            tsv_file.write(
+                f"{name.translate(_TSV_ESCAPES)}\t{email.translate(_TSV_ESCAPES)}\t{age}\n"
+            )
+
+    try:
+        result = db.execute(
+            text(
+                f"LOAD DATA LOCAL INFILE :path INTO TABLE {User.__tablename__} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                "LINES TERMINATED BY '\\n' "
+                "(name, email, age)"
+            ),
+            {"path": tsv_file.name},
+        )
+    finally:
+        os.unlink(tsv_file.name)
+
+    # LOCAL implies IGNORE: bad or over-long values become warnings instead of
+    # errors, so fail the batch the way a strict-mode INSERT would.
+    warnings = [row for row in db.execute(text("SHOW WARNINGS")) if row[0] != "Note"]
+    if warnings:
+        raise ValueError(
+            f"LOAD DATA rejected or truncated {len(warnings)} values: "
+            + "; ".join(str(row[2]) for row in warnings[:3])
+        )
+
+    return result.rowcount
 
 
 def create_upload_job(
     db: Session,
-    job_id: str,
+    job_id: bytes,
     filename: str,
     saved_path: str,
     chunk_size: int,
@@ -27,53 +73,64 @@ def create_upload_job(
         created_at=datetime.utcnow(),
     )
     db.add(job)
-    db.commit()
-    db.refresh(job)
     return job
 
 
-def get_upload_job(db: Session, job_id: str) -> UploadJob | None:
+def get_upload_job(db: Session, job_id: bytes) -> UploadJob | None:
     return db.query(UploadJob).filter(UploadJob.job_id == job_id).first()
 
 
-def set_upload_job_running(db: Session, job_id: str) -> None:
-    db.query(UploadJob).filter(UploadJob.job_id == job_id).update(
-        {"status": "running", "started_at": datetime.utcnow(), "error": None}
+def _update_upload_job(db: Session, job_id: bytes, **values: Any) -> None:
+    db.execute(
+        update(UploadJob)
+        .where(UploadJob.job_id == job_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
     )
-    db.commit()
 
 
-def set_upload_job_completed(db: Session, job_id: str, inserted_rows: int) -> None:
-    db.query(UploadJob).filter(UploadJob.job_id == job_id).update(
-        {
-            "status": "completed",
-            "inserted_rows": inserted_rows,
-            "completed_at": datetime.utcnow(),
-            "error": None,
-        }
+def set_upload_job_running(db: Session, job_id: bytes) -> None:
+    _update_upload_job(
+        db, job_id, status="running", started_at=datetime.utcnow(), error=None
     )
-    db.commit()
 
 
-def set_upload_job_failed(db: Session, job_id: str, error: str) -> None:
-    db.query(UploadJob).filter(UploadJob.job_id == job_id).update(
-        {
-            "status": "failed",
-            "error": error,
-            "completed_at": datetime.utcnow(),
-        }
+def set_upload_job_completed(db: Session, job_id: bytes, inserted_rows: int) -> None:
+    _update_upload_job(
+        db,
+        job_id,
+        status="completed",
+        inserted_rows=inserted_rows,
+        completed_at=datetime.utcnow(),
+        error=None,
     )
-    db.commit()
 
 
-def mark_upload_file_deleted(db: Session, job_id: str) -> None:
-    db.query(UploadJob).filter(UploadJob.job_id == job_id).update(
-        {"file_deleted_at": datetime.utcnow()}
+def set_upload_job_failed(db: Session, job_id: bytes, error: str) -> None:
+    _update_upload_job(
+        db,
+        job_id,
+        status="failed",
+        error=error,
+        completed_at=datetime.utcnow(),
     )
-    db.commit()
 
 
-def get_jobs_for_cleanup(db: Session, completed_before: datetime) -> list[UploadJob]:
+def mark_upload_files_deleted(db: Session, job_ids: Sequence[bytes]) -> None:
+    if not job_ids:
+        return
+
+    db.execute(
+        update(UploadJob)
+        .where(UploadJob.job_id.in_(list(job_ids)))
+        .values(file_deleted_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_jobs_for_cleanup(
+    db: Session, completed_before: datetime
+) -> Iterable[UploadJob]:
     return (
         db.query(UploadJob)
         .filter(
@@ -84,12 +141,20 @@ def get_jobs_for_cleanup(db: Session, completed_before: datetime) -> list[Upload
                 UploadJob.saved_path.isnot(None),
             )
         )
-        .all()
+        .execution_options(stream_results=True)
+        .yield_per(JOB_QUERY_YIELD_PER)
     )
 
 
-def get_upload_jobs_by_status(db: Session, statuses: Sequence[str]) -> list[UploadJob]:
+def get_upload_jobs_by_status(
+    db: Session, statuses: Sequence[str]
+) -> Iterable[UploadJob]:
     if not statuses:
         return []
 
-    return db.query(UploadJob).filter(UploadJob.status.in_(list(statuses))).all()
+    return (
+        db.query(UploadJob)
+        .filter(UploadJob.status.in_(list(statuses)))
+        .execution_options(stream_results=True)
+        .yield_per(JOB_QUERY_YIELD_PER)
+    )
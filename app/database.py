@@ -1,10 +1,17 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
+connect_args = {}
+if (
+    settings.USE_LOAD_DATA_INFILE
+    and make_url(DATABASE_URL).get_backend_name() == "mysql"
+):
+    connect_args["local_infile"] = 1
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
@@ -0,0 +1,165 @@
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .crud import (
+    bulk_insert_users,
+    load_data_users,
+    set_upload_job_completed,
+    set_upload_job_failed,
+    set_upload_job_running,
+)
+from .database import SessionLocal
+from .xlsx_reader import iter_sheet_rows
+
+
+def _make_row_normalizer(name_idx: int, email_idx: int, age_idx: int):
+    _str = str
+    _int = int
+    _float = float
+    _isinstance = isinstance
+    numeric_types = (int, float)
+
+    def normalize(raw_row: list) -> tuple[str, str, int]:
+        value = raw_row[name_idx]
+        if type(value) is _str:
+            name = value.strip()
+        elif value is None:
+            name = ""
+        else:
+            if type(value) is _float and value.is_integer():
+                value = _int(value)
+            name = _str(value).strip()
+
+        value = raw_row[email_idx]
+        if type(value) is _str:
+            email = value.strip()
+        elif value is None:
+            email = ""
+        else:
+            if type(value) is _float and value.is_integer():
+                value = _int(value)
+            email = _str(value).strip()
+
+        age_value = raw_row[age_idx]
+        if _isinstance(age_value, numeric_types):
+            try:
+                age = _int(age_value)
+            except (OverflowError, ValueError):
+                age = 0
+        elif age_value is None or age_value == "":
+            age = 0
+        else:
+            try:
+                age = _int(_float(age_value))
+            except (OverflowError, TypeError, ValueError):
+                age = 0
+
+        return name, email, age
+
+    return normalize
+
+
+def _insert_batch(
+    db: Session,
+    names: list[str],
+    emails: list[str],
+    ages: list[int],
+    use_load_data: bool,
+) -> int:
+    if use_load_data:
+        return load_data_users(db, names, emails, ages)
+
+    bulk_insert_users(
+        db,
+        [
+            {"name": name, "email": email, "age": age}
+            for name, email, age in zip(names, emails, ages)
+        ],
+    )
+    return len(names)
+
+
+def process_excel_job(job_id: bytes, file_path: Path) -> None:
+    db = SessionLocal()
+    rows = None
+
+    try:
+        set_upload_job_running(db, job_id)
+        db.commit()
+
+        rows = iter_sheet_rows(file_path)
+        headers = next(rows, None)
+        if headers is None:
+            raise ValueError("Excel file is empty")
+
+        header_map = {
+            str(value).strip().lower(): index
+            for index, value in enumerate(headers)
+            if value is not None and str(value).strip()
+        }
+
+        missing_columns = settings.REQUIRED_COLUMNS_SET - header_map.keys()
+        if missing_columns:
+            raise ValueError(
+                f"Excel must contain columns: {settings.REQUIRED_COLUMNS}. "
+                f"Missing: {sorted(missing_columns, key=settings.REQUIRED_COLUMNS.index)}"
+            )
+
+        column_map = {
+            "name": header_map["name"],
+            "email": header_map["email"],
+            "age": header_map["age"],
+        }
+
+        batch_size = settings.EXCEL_CHUNK_SIZE
+        names: list = [None] * batch_size
+        emails: list = [None] * batch_size
+        ages: list = [None] * batch_size
+        filled = 0
+        inserted_rows = 0
+
+        use_load_data = (
+            settings.USE_LOAD_DATA_INFILE and db.get_bind().dialect.name == "mysql"
+        )
+
+        row_width = max(column_map.values()) + 1
+        normalize = _make_row_normalizer(
+            column_map["name"], column_map["email"], column_map["age"]
+        )
+
+        for row in rows:
+            if len(row) < row_width:
+                row.extend([None] * (row_width - len(row)))
+
+            name, email, age = normalize(row)
+
+            if not name and not email and age == 0:
+                continue
+
+            names[filled] = name
+            emails[filled] = email
+            ages[filled] = age
+            filled += 1
+
+            if filled == batch_size:
+                inserted_rows += _insert_batch(db, names, emails, ages, use_load_data)
+                filled = 0
+
+        if filled:
+            inserted_rows += _insert_batch(
+                db, names[:filled], emails[:filled], ages[:filled], use_load_data
+            )
+
+        set_upload_job_completed(db, job_id, inserted_rows)
+        db.commit()
+
+    except Exception as exc:
+        db.rollback()
+        set_upload_job_failed(db, job_id, str(exc))
+        db.commit()
+    finally:
+        if rows is not None:
+            rows.close()
+        db.close()
@@ -1,31 +1,62 @@
+import asyncio
+import base64
+import binascii
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from threading import Thread
+from threading import Lock, Thread
 from uuid import uuid4
 
-from fastapi import BackgroundTasks, Depends, FastAPI, File, HTTPException, UploadFile
-from openpyxl import load_workbook
+from fastapi import Depends, FastAPI, File, HTTPException, UploadFile
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from .config import settings
 from .crud import (
-    bulk_insert_users,
     create_upload_job,
     get_upload_jobs_by_status,
     get_jobs_for_cleanup,
     get_upload_job,
-    mark_upload_file_deleted,
-    set_upload_job_completed,
+    mark_upload_files_deleted,
     set_upload_job_failed,
-    set_upload_job_running,
 )
 from .database import Base, SessionLocal, engine
+from .jobs import process_excel_job
 from .models import User
 
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI()
 
+logger = logging.getLogger(__name__)
+
+UPLOAD_COPY_BUFFER_SIZE = 1 << 18
+CLEANUP_UNLINK_WORKERS = 8
+
+_cleanup_lock = Lock()
+
+
+_executor_lock = Lock()
+
+
+EXECUTOR: ProcessPoolExecutor | None = None
+
+
+def _create_executor() -> ProcessPoolExecutor:
+    # spawn, not fork: the server has live threads (anyio threadpool, cleanup
+    # pool) whose locks a forked child could inherit in a held state. Spawned
+    # workers only import app.jobs, which has no import-time side effects.
+    return ProcessPoolExecutor(
+        max_workers=settings.EXCEL_WORKER_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
 
 def get_db():
     db = SessionLocal()
@@ -43,35 +74,37 @@ def _save_upload_file(file: UploadFile) -> Path:
     unique_name = f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex}{extension}"
     file_path = upload_dir / unique_name
 
-    with file_path.open("wb") as out_file:
-        while True:
-            chunk = file.file.read(1024 * 1024)
-            if not chunk:
-                break
-            out_file.write(chunk)
+    with file_path.open("wb", buffering=UPLOAD_COPY_BUFFER_SIZE) as out_file:
+        shutil.copyfileobj(file.file, out_file, length=UPLOAD_COPY_BUFFER_SIZE)
 
     return file_path
 
 
-def _normalize_row(raw_row: tuple, column_map: dict[str, int]) -> dict:
-    def get_value(column_name: str):
-        return raw_row[column_map[column_name]]
+def _encode_job_id(job_id: bytes) -> str:
+    return base64.urlsafe_b64encode(job_id).rstrip(b"=").decode("ascii")
 
-    name = str(get_value("name") or "").strip()
-    email = str(get_value("email") or "").strip()
 
-    age_value = get_value("age")
-    try:
-        age = int(float(age_value)) if age_value not in (None, "") else 0
-    except (TypeError, ValueError):
-        age = 0
+def _decode_job_id(job_id: str) -> bytes | None:
+    if len(job_id) == 32:
+        try:
+            return bytes.fromhex(job_id)
+        except ValueError:
+            return None
 
-    return {"name": name, "email": email, "age": age}
+    try:
+        raw = base64.b64decode(
+            job_id + "=" * (-len(job_id) % 4), altchars=b"-_", validate=True
+        )
+    except (binascii.Error, ValueError):
+        return None
+    if len(raw) != 16 or _encode_job_id(raw) != job_id:
+        return None
+    return raw
 
 
 def _serialize_job(job) -> dict:
     return {
-        "job_id": job.job_id,
+        "job_id": _encode_job_id(job.job_id),
         "status": job.status,
         "filename": job.filename,
         "saved_path": job.saved_path,
@@ -85,130 +118,155 @@ def _serialize_job(job) -> dict:
     }
 
 
-def cleanup_expired_uploads(db: Session) -> int:
+def cleanup_expired_uploads(db: Session) -> int | None:
     if not settings.CLEANUP_EXPIRED_UPLOADS:
         return 0
 
-    cutoff = datetime.utcnow() - timedelta(hours=settings.UPLOAD_FILE_RETENTION_HOURS)
-    cleanup_jobs = get_jobs_for_cleanup(db, cutoff)
-
-    deleted_files = 0
-    for job in cleanup_jobs:
-        try:
-            file_path = Path(job.saved_path)
-            if file_path.exists() and file_path.is_file():
-                file_path.unlink()
-                deleted_files += 1
-            mark_upload_file_deleted(db, job.job_id)
-        except OSError:
-            continue
-
-    return deleted_files
+    if not _cleanup_lock.acquire(blocking=False):
+        return None
 
+    try:
+        return _delete_expired_uploads(db)
+    finally:
+        _cleanup_lock.release()
 
-def process_excel_job(job_id: str, file_path: Path) -> None:
-    db = SessionLocal()
-    workbook = None
 
+def _unlink_upload_file(saved_path: str) -> bool | None:
     try:
-        set_upload_job_running(db, job_id)
-
-        workbook = load_workbook(filename=file_path, read_only=True, data_only=True)
-        worksheet = workbook.active
+        os.unlink(saved_path)
+    except FileNotFoundError:
+        return False
+    except OSError as exc:
+        logger.warning(
+            "Could not delete expired upload %s (errno %s): %s",
+            saved_path,
+            exc.errno,
+            exc.strerror,
+        )
+        return None
+    return True
+
+
+def _delete_expired_uploads(db: Session) -> int:
+    cutoff = datetime.utcnow() - timedelta(hours=settings.UPLOAD_FILE_RETENTION_HOURS)
+    cleanup_jobs = [
+        (job.job_id, job.saved_path) for job in get_jobs_for_cleanup(db, cutoff)
+    ]
+    if not cleanup_jobs:
+        return 0
 
-        rows = worksheet.iter_rows(values_only=True)
-        headers = next(rows, None)
-        if headers is None:
-            raise ValueError("Excel file is empty")
+    with ThreadPoolExecutor(max_workers=CLEANUP_UNLINK_WORKERS) as pool:
+        results = list(
+            pool.map(_unlink_upload_file, [saved_path for _, saved_path in cleanup_jobs])
+        )
 
-        header_map = {
-            str(value).strip().lower(): index
-            for index, value in enumerate(headers)
-            if value is not None and str(value).strip()
-        }
+    deleted_job_ids = [
+        job_id
+        for (job_id, _), deleted in zip(cleanup_jobs, results)
+        if deleted is not None
+    ]
+    mark_upload_files_deleted(db, deleted_job_ids)
+    db.commit()
 
-        missing_columns = [
-            column for column in settings.REQUIRED_COLUMNS if column not in header_map
-        ]
-        if missing_columns:
-            raise ValueError(
-                f"Excel must contain columns: {settings.REQUIRED_COLUMNS}. "
-                f"Missing: {missing_columns}"
-            )
+    return sum(1 for deleted in results if deleted)
 
-        column_map = {
-            "name": header_map["name"],
-            "email": header_map["email"],
-            "age": header_map["age"],
-        }
 
-        batch: list[dict] = []
-        inserted_rows = 0
+def _on_job_done(job_id: bytes, future: Future) -> None:
+    if future.cancelled():
+        return
 
-        for row in rows:
-            if row is None:
-                continue
+    exc = future.exception()
+    if exc is None:
+        return
 
-            user = _normalize_row(row, column_map)
+    logger.error("Excel job %s crashed", _encode_job_id(job_id), exc_info=exc)
+    # Done callbacks run on the pool's management thread; keep the DB write
+    # off it so a slow database cannot stall result handling for other jobs.
+    Thread(target=_mark_job_crashed, args=(job_id, exc), daemon=True).start()
 
-            if not user["name"] and not user["email"] and user["age"] == 0:
-                continue
 
-            batch.append(user)
+def _mark_job_crashed(job_id: bytes, exc: BaseException) -> None:
+    try:
+        with SessionLocal.begin() as db:
+            set_upload_job_failed(db, job_id, f"Job crashed: {exc!r}")
+    except Exception:
+        logger.exception("Could not mark Excel job %s as failed", _encode_job_id(job_id))
 
-            if len(batch) >= settings.EXCEL_CHUNK_SIZE:
-                bulk_insert_users(db, batch)
-                inserted_rows += len(batch)
-                batch.clear()
 
-        if batch:
-            bulk_insert_users(db, batch)
-            inserted_rows += len(batch)
+def _submit_job(job_id: bytes, file_path: Path) -> None:
+    global EXECUTOR
 
-        set_upload_job_completed(db, job_id, inserted_rows)
+    with _executor_lock:
+        try:
+            future = EXECUTOR.submit(process_excel_job, job_id, file_path)
+        except BrokenProcessPool:
+            logger.warning("Excel worker pool is broken, starting a new one")
+            EXECUTOR.shutdown(wait=False)
+            EXECUTOR = _create_executor()
+            future = EXECUTOR.submit(process_excel_job, job_id, file_path)
 
-    except Exception as exc:
-        set_upload_job_failed(db, job_id, str(exc))
-    finally:
-        if workbook is not None:
-            workbook.close()
-        db.close()
+    future.add_done_callback(partial(_on_job_done, job_id))
 
 
 def _recover_jobs_after_restart() -> None:
     db = SessionLocal()
     try:
-        interrupted_jobs = get_upload_jobs_by_status(db, ["running"])
-        for job in interrupted_jobs:
+        interrupted_job_ids = [
+            job.job_id for job in get_upload_jobs_by_status(db, ["running"])
+        ]
+        for job_id in interrupted_job_ids:
             set_upload_job_failed(
                 db,
-                job.job_id,
+                job_id,
                 "Job interrupted because server restarted",
             )
+        db.commit()
+
+        for job in get_upload_jobs_by_status(db, ["queued"]):
+            file_path = Path(job.saved_path)
+            if not file_path.exists():
+                with SessionLocal.begin() as db_missing:
+                    set_upload_job_failed(
+                        db_missing,
+                        job.job_id,
+                        "Queued job file not found after server restart",
+                    )
+                continue
 
-        queued_jobs = get_upload_jobs_by_status(db, ["queued"])
+            _submit_job(job.job_id, file_path)
     finally:
         db.close()
 
-    for job in queued_jobs:
-        file_path = Path(job.saved_path)
-        if not file_path.exists():
-            db_missing = SessionLocal()
-            try:
-                set_upload_job_failed(
-                    db_missing,
-                    job.job_id,
-                    "Queued job file not found after server restart",
-                )
-            finally:
-                db_missing.close()
-            continue
-
-        Thread(
-            target=process_excel_job,
-            args=(job.job_id, file_path),
-            daemon=True,
-        ).start()
+
+def _run_cleanup() -> int | None:
+    db = SessionLocal()
+    try:
+        return cleanup_expired_uploads(db)
+    finally:
+        db.close()
+
+
+async def _periodic_cleanup() -> None:
+    while True:
+        try:
+            deleted_files = await run_in_threadpool(_run_cleanup)
+            if deleted_files is None:
+                logger.info("Expired upload cleanup skipped, already running")
+            else:
+                logger.info("Expired upload cleanup deleted %d files", deleted_files)
+        except Exception:
+            logger.exception("Expired upload cleanup failed")
+
+        await asyncio.sleep(settings.CLEANUP_INTERVAL_SECONDS)
+
+
+@app.on_event("startup")
+def startup_executor() -> None:
+    global EXECUTOR
+
+    with _executor_lock:
+        if EXECUTOR is None:
+            EXECUTOR = _create_executor()
 
 
 @app.on_event("startup")
@@ -216,6 +274,29 @@ def startup_recovery() -> None:
     _recover_jobs_after_restart()
 
 
+@app.on_event("startup")
+async def startup_cleanup() -> None:
+    app.state.cleanup_task = None
+    if settings.CLEANUP_EXPIRED_UPLOADS:
+        app.state.cleanup_task = asyncio.create_task(_periodic_cleanup())
+
+
+@app.on_event("shutdown")
+async def shutdown_cleanup() -> None:
+    if app.state.cleanup_task is not None:
+        app.state.cleanup_task.cancel()
+
+
+@app.on_event("shutdown")
+def shutdown_executor() -> None:
+    global EXECUTOR
+
+    with _executor_lock:
+        if EXECUTOR is not None:
+            EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            EXECUTOR = None
+
+
 @app.get("/")
 def read_root():
     return {"message": "API is running"}
@@ -228,7 +309,6 @@ def count_users(db: Session = Depends(get_db)):
 
 @app.post("/upload-excel/")
 async def upload_excel(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ):
@@ -238,10 +318,8 @@ async def upload_excel(
     if not file.filename.lower().endswith(".xlsx"):
         raise HTTPException(status_code=400, detail="Only .xlsx files are supported")
 
-    cleanup_expired_uploads(db)
-
     file_path = _save_upload_file(file)
-    job_id = uuid4().hex
+    job_id = uuid4().bytes
 
     create_upload_job(
         db=db,
@@ -250,12 +328,13 @@ async def upload_excel(
         saved_path=str(file_path),
         chunk_size=settings.EXCEL_CHUNK_SIZE,
     )
+    db.commit()
 
-    background_tasks.add_task(process_excel_job, job_id, file_path)
+    _submit_job(job_id, file_path)
 
     return {
         "message": "File saved and processing job created",
-        "job_id": job_id,
+        "job_id": _encode_job_id(job_id),
         "status": "queued",
         "saved_path": str(file_path),
         "chunk_size": settings.EXCEL_CHUNK_SIZE,
@@ -264,9 +343,8 @@ async def upload_excel(
 
 @app.get("/jobs/{job_id}")
 def get_job_status(job_id: str, db: Session = Depends(get_db)):
-    cleanup_expired_uploads(db)
-
-    job = get_upload_job(db, job_id)
+    raw_job_id = _decode_job_id(job_id)
+    job = get_upload_job(db, raw_job_id) if raw_job_id is not None else None
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -276,6 +354,9 @@ def get_job_status(job_id: str, db: Session = Depends(get_db)):
 @app.post("/jobs/cleanup")
 def cleanup_jobs(db: Session = Depends(get_db)):
     deleted_files = cleanup_expired_uploads(db)
+    if deleted_files is None:
+        raise HTTPException(status_code=409, detail="Cleanup already running")
+
     return {
         "message": "Cleanup completed",
         "deleted_files": deleted_files,
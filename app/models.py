@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import BINARY, Column, DateTime, Index, Integer, String, Text
 from .database import Base
 
 class User(Base):
@@ -13,8 +13,12 @@ class User(Base):
 
 class UploadJob(Base):
     __tablename__ = "upload_jobs"
+    __table_args__ = (
+        Index("ix_upload_jobs_status", "status"),
+        Index("ix_upload_jobs_cleanup", "completed_at", "file_deleted_at"),
+    )
 
-    job_id = Column(String(64), primary_key=True, index=True)
+    job_id = Column(BINARY(16), primary_key=True)
     filename = Column(String(255), nullable=False)
     saved_path = Column(String(512), nullable=False)
     status = Column(String(32), nullable=False, default="queued")
@@ -0,0 +1,187 @@
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+from pathlib import Path
+from typing import Iterator
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # pragma: no cover - optional Rust reader
+    CalamineWorkbook = None
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+SHEET_DATA_TAG = f"{MAIN_NS}sheetData"
+ROW_TAG = f"{MAIN_NS}row"
+CELL_TAG = f"{MAIN_NS}c"
+VALUE_TAG = f"{MAIN_NS}v"
+INLINE_STRING_TAG = f"{MAIN_NS}is"
+TEXT_TAG = f"{MAIN_NS}t"
+RUN_TAG = f"{MAIN_NS}r"
+SHARED_ITEM_TAG = f"{MAIN_NS}si"
+
+DEFAULT_SHEET_PATH = "xl/worksheets/sheet1.xml"
+SHARED_STRINGS_PATH = "xl/sharedStrings.xml"
+
+
+def _string_item_text(element: ET.Element) -> str:
+    text = element.find(TEXT_TAG)
+    if text is not None:
+        return text.text or ""
+
+    return "".join(
+        run_text.text or ""
+        for run_text in (run.find(TEXT_TAG) for run in element.iter(RUN_TAG))
+        if run_text is not None
+    )
+
+
+def _load_shared_strings(archive: zipfile.ZipFile) -> tuple[str, ...]:
+    if SHARED_STRINGS_PATH not in archive.NameToInfo:
+        return ()
+
+    shared_list: list[str] = []
+    root = None
+    with archive.open(SHARED_STRINGS_PATH) as source:
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+
+            if elem.tag == SHARED_ITEM_TAG:
+                shared_list.append(_string_item_text(elem))
+                elem.clear()
+                root.remove(elem)
+
+    return tuple(shared_list)
+
+
+def _active_sheet(archive: zipfile.ZipFile) -> tuple[int, str]:
+    try:
+        workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+        relations = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    except KeyError:
+        return 0, DEFAULT_SHEET_PATH
+
+    sheets = workbook.findall(f"{MAIN_NS}sheets/{MAIN_NS}sheet")
+    if not sheets:
+        return 0, DEFAULT_SHEET_PATH
+
+    view = workbook.find(f"{MAIN_NS}bookViews/{MAIN_NS}workbookView")
+    active_tab = int(view.get("activeTab", "0")) if view is not None else 0
+    if not 0 <= active_tab < len(sheets):
+        active_tab = 0
+
+    relation_id = sheets[active_tab].get(f"{REL_NS}id")
+    for relation in relations.iter(f"{PKG_REL_NS}Relationship"):
+        if relation.get("Id") != relation_id:
+            continue
+
+        target = relation.get("Target", "")
+        if target.startswith("/"):
+            return active_tab, target.lstrip("/")
+        return active_tab, posixpath.normpath(posixpath.join("xl", target))
+
+    return active_tab, DEFAULT_SHEET_PATH
+
+
+def _column_index(cell_ref: str) -> int:
+    index = 0
+    for char in cell_ref:
+        if char.isdigit():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index - 1
+
+
+def _to_number(text: str) -> int | float:
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _cell_value(cell: ET.Element, shared: tuple[str, ...]):
+    cell_type = cell.get("t")
+
+    if cell_type == "inlineStr":
+        inline = cell.find(INLINE_STRING_TAG)
+        return _string_item_text(inline) if inline is not None else None
+
+    # Formulas are never evaluated: a formula cell yields whatever cached <v>
+    # result the writer stored. Uploaded user sheets are assumed to be plain
+    # values, so no per-cell formula or cached-result lookup is done.
+    value = cell.find(VALUE_TAG)
+    if value is None or value.text is None:
+        return None
+
+    text = value.text
+    if cell_type == "s":
+        return shared[int(text)]
+    if cell_type == "b":
+        return text == "1"
+    if cell_type in ("str", "e", "d"):
+        return text
+    return _to_number(text)
+
+
+def _iter_calamine_rows(file_path: Path | str) -> Iterator[list]:
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_index, _ = _active_sheet(archive)
+
+    with CalamineWorkbook.from_path(str(file_path)) as workbook:
+        rows = workbook.get_sheet_by_index(sheet_index).iter_rows()
+        # Calamine pads the sheet with "" rows up to the first used one, which
+        # the XML reader never yields; skip them so the header comes first.
+        for row in rows:
+            if any(value != "" for value in row):
+                yield row
+                break
+
+        yield from rows
+
+
+def _iter_row_elements(source) -> Iterator[ET.Element]:
+    sheet_data = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if elem.tag == SHEET_DATA_TAG:
+                sheet_data = elem
+            continue
+
+        if elem.tag == ROW_TAG:
+            yield elem
+            elem.clear()
+            if sheet_data is not None:
+                sheet_data.remove(elem)
+
+
+def _iter_xml_rows(file_path: Path | str) -> Iterator[list]:
+    # The shared strings table is fully materialized as a tuple before any row
+    # is parsed, so a t="s" cell resolves with a single shared[int(v)] index
+    # instead of a dict probe or another pass over sharedStrings.xml.
+    with zipfile.ZipFile(file_path) as archive:
+        shared = _load_shared_strings(archive)
+        _, sheet_path = _active_sheet(archive)
+
+        with archive.open(sheet_path) as source:
+            for elem in _iter_row_elements(source):
+                row: list = []
+                for cell in elem.iter(CELL_TAG):
+                    cell_ref = cell.get("r")
+                    if cell_ref:
+                        column = _column_index(cell_ref)
+                        if column > len(row):
+                            row.extend([None] * (column - len(row)))
+                    row.append(_cell_value(cell, shared))
+
+                yield row
+
+
+def iter_sheet_rows(file_path: Path | str) -> Iterator[list]:
+    if CalamineWorkbook is not None:
+        return _iter_calamine_rows(file_path)
+    return _iter_xml_rows(file_path)
@@ -0,0 +1,8 @@
+-- Adds the upload_jobs indexes declared in app/models.py to a table that
+-- Base.metadata.create_all created before they existed (create_all never
+-- alters an existing table).
+--
+--   mysql excel_db < migrations/0001_upload_jobs_indexes.sql
+
+CREATE INDEX ix_upload_jobs_status ON upload_jobs (status);
+CREATE INDEX ix_upload_jobs_cleanup ON upload_jobs (completed_at, file_deleted_at);
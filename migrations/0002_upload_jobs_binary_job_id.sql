@@ -0,0 +1,21 @@
+-- Converts upload_jobs.job_id from the 32-character hex VARCHAR(64) key to
+-- BINARY(16). UNHEX(job_id) is exactly the uuid4().bytes value the API now
+-- stores, so existing jobs keep their identity and their old hex ids still
+-- resolve through GET /jobs/{job_id}.
+--
+-- Stop the API and its workers first, then:
+--
+--   mysql excel_db < migrations/0002_upload_jobs_binary_job_id.sql
+
+ALTER TABLE upload_jobs ADD COLUMN job_id_bin BINARY(16) NULL FIRST;
+
+UPDATE upload_jobs SET job_id_bin = UNHEX(job_id);
+
+ALTER TABLE upload_jobs
+    DROP PRIMARY KEY,
+    DROP INDEX ix_upload_jobs_job_id,
+    DROP COLUMN job_id;
+
+ALTER TABLE upload_jobs
+    CHANGE COLUMN job_id_bin job_id BINARY(16) NOT NULL FIRST,
+    ADD PRIMARY KEY (job_id);
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# app.database builds its engine at import; point it at SQLite so the tests
+# never need the MySQL server or driver.
+os.environ["DATABASE_URL"] = "sqlite://"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
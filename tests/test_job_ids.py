@@ -0,0 +1,33 @@
+from uuid import uuid4
+
+from app.main import _decode_job_id, _encode_job_id
+
+
+def test_job_id_round_trip():
+    job_id = uuid4().bytes
+    encoded = _encode_job_id(job_id)
+
+    assert len(encoded) == 22
+    assert "=" not in encoded
+    assert _decode_job_id(encoded) == job_id
+
+
+def test_urlsafe_alphabet_round_trips():
+    job_id = b"\xfb\xff" * 8
+    encoded = _encode_job_id(job_id)
+
+    assert set(encoded) & {"-", "_"}
+    assert _decode_job_id(encoded) == job_id
+
+
+def test_legacy_hex_job_id_is_accepted():
+    job_id = uuid4()
+
+    assert _decode_job_id(job_id.hex) == job_id.bytes
+
+
+def test_malformed_job_ids_are_rejected():
+    assert _decode_job_id("nope") is None
+    assert _decode_job_id("z" * 32) is None
+    assert _decode_job_id("+" * 22) is None
+    assert _decode_job_id(_encode_job_id(uuid4().bytes) + "AA") is None
@@ -0,0 +1,168 @@
+import zipfile
+
+import pytest
+
+from app import xlsx_reader
+from app.jobs import _make_row_normalizer
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+def _write_xlsx(path, sheets, shared=None, active_tab=None):
+    sheet_entries = "".join(
+        f'<sheet name="s{index}" sheetId="{index + 1}" r:id="rId{index + 1}"/>'
+        for index in range(len(sheets))
+    )
+    book_views = (
+        f'<bookViews><workbookView activeTab="{active_tab}"/></bookViews>'
+        if active_tab is not None
+        else ""
+    )
+    relations = "".join(
+        f'<Relationship Id="rId{index + 1}" Target="{target}"/>'
+        for index, (target, _) in enumerate(sheets)
+    )
+
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "xl/workbook.xml",
+            f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+            f"{book_views}<sheets>{sheet_entries}</sheets></workbook>",
+        )
+        archive.writestr(
+            "xl/_rels/workbook.xml.rels",
+            f'<Relationships xmlns="{PKG_REL_NS}">{relations}</Relationships>',
+        )
+        if shared is not None:
+            archive.writestr(
+                "xl/sharedStrings.xml",
+                f'<sst xmlns="{MAIN_NS}">{"".join(shared)}</sst>',
+            )
+        for target, rows in sheets:
+            member = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            archive.writestr(
+                member,
+                f'<worksheet xmlns="{MAIN_NS}"><sheetData>{"".join(rows)}'
+                "</sheetData></worksheet>",
+            )
+    return path
+
+
+def _normalized(rows):
+    rows = iter(rows)
+    headers = next(rows)
+    header_map = {
+        str(value).strip().lower(): index
+        for index, value in enumerate(headers)
+        if value is not None and str(value).strip()
+    }
+    normalize = _make_row_normalizer(
+        header_map["name"], header_map["email"], header_map["age"]
+    )
+    row_width = max(header_map["name"], header_map["email"], header_map["age"]) + 1
+
+    result = []
+    for row in rows:
+        row = list(row) + [None] * (row_width - len(row))
+        name, email, age = normalize(row)
+        if name or email or age:
+            result.append((name, email, age))
+    return result
+
+
+def test_cell_reference_gaps_are_filled_with_none(tmp_path):
+    path = _write_xlsx(
+        tmp_path / "gaps.xlsx",
+        [
+            (
+                "worksheets/sheet1.xml",
+                [
+                    '<row r="1"><c r="A1"><v>1</v></c><c r="D1"><v>4</v></c></row>',
+                    '<row r="3"><c r="B3"><v>2.5</v></c></row>',
+                ],
+            )
+        ],
+    )
+
+    assert list(xlsx_reader._iter_xml_rows(path)) == [[1, None, None, 4], [None, 2.5]]
+
+
+def test_inline_and_rich_text_strings(tmp_path):
+    path = _write_xlsx(
+        tmp_path / "strings.xlsx",
+        [
+            (
+                "worksheets/sheet1.xml",
+                [
+                    '<row r="1"><c r="A1" t="inlineStr"><is><t>inline</t></is></c>'
+                    '<c r="B1" t="s"><v>0</v></c><c r="C1" t="s"><v>1</v></c></row>',
+                ],
+            )
+        ],
+        shared=[
+            "<si><t>plain</t></si>",
+            "<si><r><t>Ri</t></r><r><rPr><b/></rPr><t>ch</t></r></si>",
+        ],
+    )
+
+    assert list(xlsx_reader._iter_xml_rows(path)) == [["inline", "plain", "Rich"]]
+
+
+def test_active_tab_resolves_relationship_target(tmp_path):
+    path = _write_xlsx(
+        tmp_path / "tabs.xlsx",
+        [
+            ("worksheets/first.xml", ['<row r="1"><c r="A1"><v>1</v></c></row>']),
+            ("/xl/worksheets/data.xml", ['<row r="1"><c r="A1"><v>2</v></c></row>']),
+        ],
+        active_tab=1,
+    )
+
+    with zipfile.ZipFile(path) as archive:
+        assert xlsx_reader._active_sheet(archive) == (1, "xl/worksheets/data.xml")
+    assert list(xlsx_reader._iter_xml_rows(path)) == [[2]]
+
+
+def test_out_of_range_active_tab_falls_back_to_first_sheet(tmp_path):
+    path = _write_xlsx(
+        tmp_path / "tabs.xlsx",
+        [("worksheets/first.xml", ['<row r="1"><c r="A1"><v>1</v></c></row>'])],
+        active_tab=5,
+    )
+
+    with zipfile.ZipFile(path) as archive:
+        assert xlsx_reader._active_sheet(archive) == (0, "xl/worksheets/first.xml")
+
+
+def test_calamine_and_xml_readers_agree(tmp_path):
+    pytest.importorskip("python_calamine")
+
+    path = _write_xlsx(
+        tmp_path / "users.xlsx",
+        [
+            ("worksheets/other.xml", ['<row r="1"><c r="A1"><v>9</v></c></row>']),
+            (
+                "worksheets/users.xml",
+                [
+                    '<row r="3"><c r="B3" t="s"><v>0</v></c><c r="C3" t="s"><v>1</v></c>'
+                    '<c r="D3" t="inlineStr"><is><t>Age</t></is></c></row>',
+                    '<row r="4"><c r="B4"><v>21</v></c><c r="C4" t="s"><v>2</v></c>'
+                    '<c r="D4"><v>30.5</v></c></row>',
+                    '<row r="6"><c r="B6" t="s"><v>3</v></c><c r="D6"><v>41</v></c></row>',
+                ],
+            ),
+        ],
+        shared=[
+            "<si><t>name</t></si>",
+            "<si><t>email</t></si>",
+            "<si><t>a@example.com</t></si>",
+            "<si><r><t>Bo</t></r><r><t>b</t></r></si>",
+        ],
+        active_tab=1,
+    )
+
+    expected = [("21", "a@example.com", 30), ("Bob", "", 41)]
+    assert _normalized(xlsx_reader._iter_xml_rows(path)) == expected
+    assert _normalized(xlsx_reader._iter_calamine_rows(path)) == expected